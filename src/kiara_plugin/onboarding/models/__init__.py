@@ -9,21 +9,67 @@ Metadata models must be a sub-class of [kiara.metadata.MetadataModel][kiara.meta
 sub-class a pydantic BaseModel or implement custom base classes.
 """
 import os.path
+import re
+import shutil
+import stat
 from abc import abstractmethod
-from typing import List, Tuple, Union
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Mapping, Tuple, Union
 
 from kiara.exceptions import KiaraException
 from kiara.models import KiaraModel
 from kiara.models.filesystem import FolderImportConfig, KiaraFile, KiaraFileBundle
 
 
+@dataclass
+class AcceptContext:
+    """Per-uri state that is shared between 'accepts_uri' and 'retrieve' calls, so work done while probing a uri is not repeated."""
+
+    stat_checked: bool = False
+    stat_result: Union[None, os.stat_result] = None
+
+
+def _classify(
+    path: str, ctx: Union[None, AcceptContext] = None, follow_symlinks: bool = True
+) -> Tuple[bool, bool, bool]:
+    """Stat a local path once, and return whether it exists, is a file, or is a directory.
+
+    The path is 'lstat'-ed first, the symlink target is only stat-ed if the path is a symlink and 'follow_symlinks' is set.
+    """
+
+    if ctx is not None and ctx.stat_checked:
+        st = ctx.stat_result
+    else:
+        try:
+            abs_path = os.path.abspath(path)
+            st = os.lstat(abs_path)
+            if follow_symlinks and stat.S_ISLNK(st.st_mode):
+                st = os.stat(abs_path)
+        except (OSError, ValueError):
+            # same failure semantics as 'os.path.exists'
+            st = None
+        if ctx is not None:
+            ctx.stat_checked = True
+            ctx.stat_result = st
+
+    if st is None:
+        return False, False, False
+
+    return True, stat.S_ISREG(st.st_mode), stat.S_ISDIR(st.st_mode)
+
+
 class OnboardDataModel(KiaraModel):
 
     _kiara_model_id: str = None  # type: ignore
+    # set to 'True' if the 'accepts_*'/'retrieve*' methods take an optional 'ctx' keyword argument,
+    # models (incl. those of other plugins) that don't are called with the plain signatures
+    _uses_accept_context: bool = False
 
     @classmethod
-    def get_config_fields(cls) -> List[str]:
-        return sorted(cls.__fields__.keys())
+    @lru_cache(maxsize=None)
+    def get_config_fields(cls) -> Tuple[str, ...]:
+        return tuple(sorted(cls.__fields__.keys()))
 
     @classmethod
     @abstractmethod
@@ -49,32 +95,44 @@ class OnboardDataModel(KiaraModel):
 class FileFromLocalModel(OnboardDataModel):
 
     _kiara_model_id: str = "onboarding.file.from.local_file"
+    _uses_accept_context: bool = True
 
     @classmethod
-    def accepts_uri(cls, uri: str) -> Tuple[bool, str]:
+    def accepts_uri(
+        cls, uri: str, ctx: Union[None, AcceptContext] = None
+    ) -> Tuple[bool, str]:
 
-        if os.path.isfile(os.path.abspath(uri)):
+        _, is_file, _ = _classify(uri, ctx=ctx)
+        if is_file:
             return True, "local file exists and is file"
         else:
             return False, "local file does not exist or is not a file"
 
     @classmethod
-    def accepts_bundle_uri(cls, uri: str) -> Tuple[bool, str]:
+    def accepts_bundle_uri(
+        cls, uri: str, ctx: Union[None, AcceptContext] = None
+    ) -> Tuple[bool, str]:
 
-        if os.path.isdir(os.path.abspath(uri)):
+        _, _, is_dir = _classify(uri, ctx=ctx)
+        if is_dir:
             return True, "local folder exists and is folder"
         else:
             return False, "local folder does not exist or is not a folder"
 
     def retrieve(
-        self, uri: str, file_name: Union[None, str], attach_metadata: bool
+        self,
+        uri: str,
+        file_name: Union[None, str],
+        attach_metadata: bool,
+        ctx: Union[None, AcceptContext] = None,
     ) -> KiaraFile:
 
-        if not os.path.exists(os.path.abspath(uri)):
+        exists, is_file, _ = _classify(uri, ctx=ctx)
+        if not exists:
             raise KiaraException(
                 f"Can't create file from path '{uri}': path does not exist."
             )
-        if not os.path.isfile(os.path.abspath(uri)):
+        if not is_file:
             raise KiaraException(
                 f"Can't create file from path '{uri}': path is not a file."
             )
@@ -82,14 +140,19 @@ class FileFromLocalModel(OnboardDataModel):
         return KiaraFile.load_file(uri)
 
     def retrieve_bundle(
-        self, uri: str, import_config: FolderImportConfig, attach_metadata: bool
+        self,
+        uri: str,
+        import_config: FolderImportConfig,
+        attach_metadata: bool,
+        ctx: Union[None, AcceptContext] = None,
     ) -> KiaraFileBundle:
 
-        if not os.path.exists(os.path.abspath(uri)):
+        exists, _, is_dir = _classify(uri, ctx=ctx)
+        if not exists:
             raise KiaraException(
                 f"Can't create file from path '{uri}': path does not exist."
             )
-        if not os.path.isdir(os.path.abspath(uri)):
+        if not is_dir:
             raise KiaraException(
                 f"Can't create file from path '{uri}': path is not a directory."
             )
@@ -104,10 +167,8 @@ class FileFromRemoteModel(OnboardDataModel):
     @classmethod
     def accepts_uri(cls, uri: str) -> Tuple[bool, str]:
 
-        accepted_protocols = ["http", "https"]
-        for protocol in accepted_protocols:
-            if uri.startswith(f"{protocol}://"):
-                return True, "url is valid (starts with http or https)"
+        if uri.startswith(("http://", "https://")):
+            return True, "url is valid (starts with http or https)"
 
         return False, "url is not valid (does not start with http or https)"
 
@@ -132,6 +193,54 @@ class FileFromRemoteModel(OnboardDataModel):
         return result_bundle
 
 
+@lru_cache(maxsize=1)
+def _get_zenodo_client() -> Any:
+    """Return a (shared) Zenodo api client, the client does not hold any per-request state."""
+
+    import pyzenodo3
+
+    return pyzenodo3.Zenodo()
+
+
+@lru_cache(maxsize=32)
+def _get_zenodo_record(doi: str) -> Any:
+    """Retrieve (and cache) the Zenodo record for the provided DOI."""
+
+    return _get_zenodo_client().find_record_by_doi(doi)
+
+
+# matches 'zenodo:<prefix>/zenodo.<id>[/<path>]', as well as urls that contain '/zenodo.<id>[/<path>]'
+_ZENODO_RE = re.compile(
+    r"^(?:zenodo:)?(?P<prefix>.+?)/zenodo\.(?P<zid>[^/]+)(?:/(?P<path>.*))?$"
+)
+
+
+def _parse_zenodo_uri(uri: str) -> Tuple[str, Union[None, str]]:
+    """Parse a Zenodo uri into the record DOI, and the (optional) path of a file within that record."""
+
+    m = _ZENODO_RE.match(uri)
+    if m is None:
+        raise KiaraException(msg=f"Can't parse Zenodo DOI from URI: {uri}")
+
+    return f"{m.group('prefix')}/zenodo.{m.group('zid')}", m.group("path") or None
+
+
+def _resolve_zenodo_file(record: Any, file_path: str) -> Mapping[str, Any]:
+    """Find the metadata of the file with the provided key in a Zenodo record."""
+
+    files_by_key = {f["key"]: f for f in record.data["files"]}
+    match = files_by_key.get(file_path, None)
+    if match is None:
+        msg = "Available files:\n"
+        for key in files_by_key.keys():
+            msg += f"  - {key}\n"
+        raise KiaraException(
+            msg=f"Can't find file '{file_path}' in Zenodo record. {msg}"
+        )
+
+    return match
+
+
 class FileFromZenodoModel(OnboardDataModel):
 
     _kiara_model_id: str = "onboarding.file.from.zenodo"
@@ -151,46 +260,17 @@ class FileFromZenodoModel(OnboardDataModel):
         self, uri: str, file_name: Union[None, str], attach_metadata: bool
     ) -> KiaraFile:
 
-        import pyzenodo3
-
         from kiara_plugin.onboarding.utils.download import download_file
 
-        if uri.startswith("zenodo:"):
-            doi = uri[len("zenodo:") :]
-        elif "/zenodo." in uri:
-            doi = uri
-
-        tokens = doi.split("/zenodo.")
-        if len(tokens) != 2:
-            raise KiaraException(
-                msg=f"Can't parse Zenodo DOI from URI for single file download: {doi}"
-            )
-
-        path_components = tokens[1].split("/", maxsplit=1)
-        if len(path_components) != 2:
+        _doi, file_path = _parse_zenodo_uri(uri)
+        if file_path is None:
             raise KiaraException(
-                msg=f"Can't parse Zenodo DOI from URI for single file download: {doi}"
+                msg=f"Can't parse Zenodo DOI from URI for single file download: {uri}"
             )
 
-        file_path = path_components[1]
-        _doi = f"{tokens[0]}/zenodo.{path_components[0]}"
-
-        zen = pyzenodo3.Zenodo()
-        record = zen.find_record_by_doi(_doi)
+        record = _get_zenodo_record(_doi)
 
-        match = None
-        for _available_file in record.data["files"]:
-            if file_path == _available_file["key"]:
-                match = _available_file
-                break
-
-        if not match:
-            msg = "Available files:\n"
-            for key in record.data["files"]:
-                msg += f"  - {key['key']}\n"
-            raise KiaraException(
-                msg=f"Can't find file '{file_path}' in Zenodo record. {msg}"
-            )
+        match = _resolve_zenodo_file(record, file_path)
 
         url = match["links"]["self"]
         checksum = match["checksum"][4:]
@@ -220,59 +300,36 @@ class FileFromZenodoModel(OnboardDataModel):
         self, uri: str, import_config: FolderImportConfig, attach_metadata: bool
     ) -> KiaraFileBundle:
 
-        import shutil
-
-        import pyzenodo3
-
-        from kiara_plugin.onboarding.utils.download import download_file
-
-        if uri.startswith("zenodo:"):
-            doi = uri[len("zenodo:") :]
-        elif "/zenodo." in uri:
-            doi = uri
-
-        tokens = doi.split("/zenodo.")
-        if len(tokens) != 2:
-            raise KiaraException(
-                msg=f"Can't parse Zenodo DOI from URI for single file download: {doi}"
-            )
-
-        path_components = tokens[1].split("/", maxsplit=1)
-
-        if len(path_components) == 2:
-            zid = path_components[0]
-            file_path = path_components[1]
-        else:
-            zid = path_components[0]
-            file_path = None
+        from kiara_plugin.onboarding.utils.download import (
+            download_file,
+            download_files,
+        )
 
-        _doi = f"{tokens[0]}/zenodo.{zid}"
+        _doi, file_path = _parse_zenodo_uri(uri)
+        record = _get_zenodo_record(_doi)
 
         if not file_path:
 
-            zen = pyzenodo3.Zenodo()
-
-            record = zen.find_record_by_doi(_doi)
-
             path = KiaraFileBundle.create_tmp_dir()
             shutil.rmtree(path, ignore_errors=True)
             path.mkdir()
 
-            for file_data in record.data["files"]:
-                url = file_data["links"]["self"]
-                file_name = file_data["key"]
-                checksum = file_data["checksum"][4:]
-
-                target = os.path.join(path, file_name)
-                file_model: KiaraFile
-                file_model, md5_digest = download_file(  # type: ignore
-                    url=url,
-                    target=target,
-                    file_name=file_name,
-                    attach_metadata=attach_metadata,
-                    return_md5_hash=True,
-                )
+            # (url, file_name, checksum) for every file in the record
+            download_tasks = [
+                (f["links"]["self"], f["key"], f["checksum"][4:])
+                for f in record.data["files"]
+            ]
+            # downloads are network-bound, so they run concurrently, over a shared connection pool
+            results = download_files(
+                (
+                    (url, os.path.join(path, file_name), file_name)
+                    for url, file_name, _ in download_tasks
+                ),
+                attach_metadata=attach_metadata,
+                return_md5_hash=True,
+            )
 
+            for (_, file_name, checksum), (_, md5_digest) in zip(download_tasks, results):  # type: ignore
                 if checksum != md5_digest:
                     raise KiaraException(
                         msg=f"Can't download file '{file_name}', invalid checksum: {checksum} != {md5_digest}"
@@ -284,22 +341,7 @@ class FileFromZenodoModel(OnboardDataModel):
 
         else:
 
-            zen = pyzenodo3.Zenodo()
-            record = zen.find_record_by_doi(_doi)
-
-            match = None
-            for _available_file in record.data["files"]:
-                if file_path == _available_file["key"]:
-                    match = _available_file
-                    break
-
-            if not match:
-                msg = "Available files:\n"
-                for key in record.data["files"]:
-                    msg += f"  - {key['key']}\n"
-                raise KiaraException(
-                    msg=f"Can't find file '{file_path}' in Zenodo record. {msg}"
-                )
+            match = _resolve_zenodo_file(record, file_path)
 
             url = match["links"]["self"]
             checksum = match["checksum"][4:]
@@ -347,7 +389,7 @@ class FileFromGithubModel(OnboardDataModel):
     @classmethod
     def accepts_uri(cls, uri: str) -> Tuple[bool, str]:
 
-        if uri.startswith("gh:") or uri.startswith("github:"):
+        if uri.startswith(("gh:", "github:")):
             return True, "uri is a github uri"
 
         return False, "uri is not a github uri, must start with 'gh:' or 'github:'"
@@ -8,10 +8,10 @@ from kiara.models.filesystem import FolderImportConfig
 from kiara.models.module import KiaraModuleConfig
 from kiara.models.values.value import ValueMap
 from kiara.modules import KiaraModule, ValueMapSchema
-from kiara.registries.models import ModelRegistry
-from kiara_plugin.onboarding.models import OnboardDataModel
 from kiara_plugin.onboarding.utils.download import (
+    ONBOARDING_MODEL_NAME_PREFIX,
     get_onboard_model_cls,
+    get_onboard_type_names,
     onboard_file,
     onboard_file_bundle,
 )
@@ -27,9 +27,6 @@ class OnboardFileConfig(KiaraModuleConfig):
     )
 
 
-ONBOARDING_MODEL_NAME_PREFIX = "onboarding.file.from."
-
-
 class OnboardFileModule(KiaraModule):
     """A generic module that imports a file from one of several possible sources."""
 
@@ -68,18 +65,11 @@ class OnboardFileModule(KiaraModule):
 
         if not onboard_model_cls:
 
-            available = (
-                ModelRegistry.instance()
-                .get_models_of_type(OnboardDataModel)
-                .item_infos.keys()
-            )
+            allowed = list(get_onboard_type_names())
 
-            if not available:
+            if not allowed:
                 raise KiaraException(msg="No onboard models available. This is a bug.")
 
-            idx = len(ONBOARDING_MODEL_NAME_PREFIX)
-            allowed = sorted((x[idx:] for x in available))
-
             result["onboard_type"] = {
                 "type": "string",
                 "type_config": {"allowed_strings": allowed},
@@ -215,18 +205,11 @@ class OnboardFileBundleModule(KiaraModule):
 
         if not onboard_model_cls:
 
-            available = (
-                ModelRegistry.instance()
-                .get_models_of_type(OnboardDataModel)
-                .item_infos.keys()
-            )
+            allowed = list(get_onboard_type_names())
 
-            if not available:
+            if not allowed:
                 raise KiaraException(msg="No onboard models available. This is a bug.")
 
-            idx = len(ONBOARDING_MODEL_NAME_PREFIX)
-            allowed = sorted((x[idx:] for x in available))
-
             result["onboard_type"] = {
                 "type": "string",
                 "type_config": {"allowed_strings": allowed},
@@ -264,9 +247,9 @@ class OnboardFileBundleModule(KiaraModule):
         onboard_type = self.get_config_value("onboard_type")
         source: str = inputs.get_value_data("source")
 
-        if onboard_type:
+        if not onboard_type:
             user_input_onboard_type = inputs.get_value_data("onboard_type")
-            if not user_input_onboard_type:
+            if user_input_onboard_type:
                 onboard_type = (
                     f"{ONBOARDING_MODEL_NAME_PREFIX}{user_input_onboard_type}"
                 )
@@ -10,6 +10,10 @@ from pydantic import Field
 from kiara.api import KiaraModule, KiaraModuleConfig, ValueMap, ValueMapSchema
 from kiara.exceptions import KiaraProcessingException
 from kiara.models.filesystem import KiaraFileBundle
+from kiara_plugin.onboarding.utils.download import (
+    DOWNLOAD_CHUNK_SIZE,
+    get_http_client,
+)
 
 
 class ZenodoDownloadConfig(KiaraModuleConfig):
@@ -51,8 +55,6 @@ class ZenodoDownload(KiaraModule):
 
     def download_file(self, file_data: Mapping[str, Any], target_path: Path):
 
-        import httpx
-
         url = file_data["links"]["self"]
         file_name = file_data["key"]
         checksum = file_data["checksum"][4:]
@@ -67,11 +69,10 @@ class ZenodoDownload(KiaraModule):
         hash_md5 = hashlib.md5()  # noqa
 
         with open(target_file, "ab") as file2:
-            with httpx.Client() as client:
-                with client.stream("GET", url) as resp:
-                    for chunk in resp.iter_bytes():
-                        hash_md5.update(chunk)
-                        file2.write(chunk)
+            with get_http_client().stream("GET", url) as resp:
+                for chunk in resp.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    hash_md5.update(chunk)
+                    file2.write(chunk)
 
         if checksum != hash_md5.hexdigest():
             raise KiaraProcessingException(
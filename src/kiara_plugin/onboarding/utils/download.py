@@ -1,24 +1,58 @@
 # -*- coding: utf-8 -*-
 import atexit
 import os
+import re
 import tempfile
 from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Mapping, Tuple, Type, Union
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Tuple,
+    Type,
+    Union,
+)
 
 from pydantic import BaseModel, Field
 
 from kiara.exceptions import KiaraException
 from kiara.models.filesystem import FolderImportConfig, KiaraFile, KiaraFileBundle
 from kiara.utils.files import unpack_archive
-from kiara_plugin.onboarding.models import OnboardDataModel
+from kiara_plugin.onboarding.models import (
+    AcceptContext,
+    FileFromGithubModel,
+    FileFromRemoteModel,
+    FileFromZenodoModel,
+    OnboardDataModel,
+)
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class DownloadResponseInfo(BaseModel):
+    status: int = Field(description="The status code of the response.")
+    url: str = Field(description="The url of the response.")
+    content_length: Union[None, str] = Field(
+        description="The value of the 'content-length' header of the response.",
+        default=None,
+    )
+    content_type: Union[None, str] = Field(
+        description="The value of the 'content-type' header of the response.",
+        default=None,
+    )
 
 
 class DownloadMetadata(BaseModel):
     url: str = Field(description="The url of the download request.")
-    response_headers: List[Dict[str, str]] = Field(
-        description="The response headers of the download request."
+    response_headers: List[DownloadResponseInfo] = Field(
+        description="The status, url, content-length and content-type of the response of the download request (and of any redirect responses before it)."
     )
     request_time: str = Field(description="The time the request was made.")
 
@@ -29,6 +63,24 @@ class DownloadBundleMetadata(DownloadMetadata):
     )
 
 
+# chunk size for streaming downloads (and hashing them on the fly)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# downloads of at least this size are split into parallel range requests, if the server supports it
+PARALLEL_DOWNLOAD_THRESHOLD = 64 * 1024 * 1024
+PARALLEL_DOWNLOAD_PARTS = 8
+
+# uri schemes that can only be handled by those models, this avoids probing every
+# registered model (incl. a filesystem stat by the local file model), only candidates
+# that are also registered onboard models are used
+_SCHEME_DISPATCH: Mapping[str, Tuple[Type[OnboardDataModel], ...]] = {
+    "http": (FileFromRemoteModel, FileFromZenodoModel),
+    "https": (FileFromRemoteModel, FileFromZenodoModel),
+    "zenodo": (FileFromZenodoModel,),
+    "gh": (FileFromGithubModel,),
+    "github": (FileFromGithubModel,),
+}
+
+
 @lru_cache()
 def get_onboard_model_cls(
     onboard_type: Union[str, None]
@@ -44,17 +96,177 @@ def get_onboard_model_cls(
     return model_cls  # type: ignore
 
 
+@lru_cache(maxsize=1)
+def _resolved_onboard_models() -> Tuple[Type[OnboardDataModel], ...]:
+    """Resolve the python classes of all registered onboard models (the model registry does not change during a run)."""
+
+    from kiara.registries.models import ModelRegistry
+
+    model_registry = ModelRegistry.instance()
+    onboard_models = model_registry.get_models_of_type(
+        OnboardDataModel
+    ).item_infos.values()
+
+    return tuple(
+        onboard_model.python_class.get_class() for onboard_model in onboard_models  # type: ignore
+    )
+
+
+ONBOARDING_MODEL_NAME_PREFIX = "onboarding.file.from."
+
+
+@lru_cache(maxsize=1)
+def get_onboard_model_ids() -> Tuple[str, ...]:
+    """Return the (sorted) ids of all registered onboard models."""
+
+    from kiara.registries.models import ModelRegistry
+
+    model_registry = ModelRegistry.instance()
+    return tuple(
+        sorted(model_registry.get_models_of_type(OnboardDataModel).item_infos.keys())
+    )
+
+
+@lru_cache(maxsize=1)
+def get_onboard_type_names() -> Tuple[str, ...]:
+    """Return the (sorted) names of all registered onboard models, without the 'onboarding.file.from.' prefix."""
+
+    idx = len(ONBOARDING_MODEL_NAME_PREFIX)
+    return tuple(sorted(x[idx:] for x in get_onboard_model_ids()))
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> "httpx.Client":
+    """Return the http client that is shared by all downloads, so connections (and TLS sessions) are re-used across them."""
+
+    import httpx
+
+    client = httpx.Client(
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=httpx.Timeout(30.0, connect=10.0),
+    )
+    atexit.register(client.close)
+    return client
+
+
+def _get_response_info(response: "httpx.Response") -> DownloadResponseInfo:
+    """Extract the parts of a response that are recorded in the download metadata.
+
+    Only a few relevant fields are kept, full header sets can carry cookies or tokens, and bloat the metadata.
+    """
+
+    return DownloadResponseInfo(
+        status=response.status_code,
+        url=str(response.url),
+        content_length=response.headers.get("content-length", None),
+        content_type=response.headers.get("content-type", None),
+    )
+
+
+def _get_range_validator(response: "httpx.Response") -> Union[None, str]:
+    """Return the strong validator ('ETag' or 'Last-Modified') of a response, to be used as 'If-Range' value."""
+
+    etag = response.headers.get("etag", None)
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("last-modified", None)
+
+
+def _get_parallel_download_size(response: "httpx.Response") -> int:
+    """Return the size of the response body if it should be downloaded in parallel ranges, otherwise 0."""
+
+    if response.status_code != 200:
+        return 0
+    if response.headers.get("accept-ranges", "").lower() != "bytes":
+        return 0
+    # without a validator, range responses can't be guaranteed to come from the same version of the resource
+    if _get_range_validator(response) is None:
+        return 0
+    if response.headers.get("content-encoding", "identity").lower() != "identity":
+        return 0
+
+    try:
+        size = int(response.headers.get("content-length", 0))
+    except ValueError:
+        return 0
+
+    if size < PARALLEL_DOWNLOAD_THRESHOLD:
+        return 0
+    return size
+
+
+def _download_ranges(
+    client: "httpx.Client",
+    url: str,
+    target: Path,
+    size: int,
+    validator: Union[None, str] = None,
+    parts: int = PARALLEL_DOWNLOAD_PARTS,
+) -> None:
+    """Download a file in (concurrent) byte ranges, each range is written directly to its offset in the target file.
+
+    If a validator (from the first response) is provided, it is sent as 'If-Range' header, so a server answers with the
+    full (changed) resource instead of a range of it, which is then rejected. The 'Content-Range' of every partial
+    response must match the requested range and the expected size.
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with open(target, "wb") as f:
+        f.truncate(size)
+
+    part_size = -(-size // parts)
+    ranges = [
+        (start, min(start + part_size, size) - 1) for start in range(0, size, part_size)
+    ]
+
+    def download_range(start: int, end: int):
+
+        headers = {"Range": f"bytes={start}-{end}"}
+        if validator:
+            headers["If-Range"] = validator
+        written = 0
+        with client.stream("GET", url, headers=headers) as r:
+            if r.status_code != 206:
+                raise KiaraException(
+                    f"Could not download range {start}-{end} from {url}: status code {r.status_code}."
+                )
+            content_range = r.headers.get("content-range", "")
+            m = re.match(r"^bytes (\d+)-(\d+)/(\d+)$", content_range.strip())
+            if m is None or (int(m[1]), int(m[2]), int(m[3])) != (start, end, size):
+                raise KiaraException(
+                    f"Could not download range {start}-{end} from {url}: invalid Content-Range '{content_range}' (expected size {size})."
+                )
+            with open(target, "r+b") as f:
+                f.seek(start)
+                for data in r.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(data)
+                    written += len(data)
+
+        if written != end - start + 1:
+            raise KiaraException(
+                f"Could not download range {start}-{end} from {url}: received {written} bytes."
+            )
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(download_range, start, end) for start, end in ranges]
+        for future in futures:
+            future.result()
+
+
 def download_file(
     url: str,
     target: Union[str, None] = None,
     file_name: Union[str, None] = None,
     attach_metadata: bool = True,
     return_md5_hash: bool = False,
+    client: Union[None, "httpx.Client"] = None,
+    parallel_ranges: bool = True,
 ) -> Union[KiaraFile, Tuple[KiaraFile, str]]:
 
     import hashlib
 
-    import httpx
     import pytz
 
     if not file_name:
@@ -70,28 +282,49 @@ def download_file(
         atexit.register(rm_tmp_file)
 
         _target = Path(tmp_file.name)
+        # write to the already opened temp file, instead of opening it a second time
+        target_file: IO[bytes] = tmp_file  # type: ignore
     else:
         _target = Path(target)
         _target.parent.mkdir(parents=True, exist_ok=True)
+        target_file = open(_target, "wb")
 
     if return_md5_hash:
         hash_md5 = hashlib.md5()  # noqa
 
     history = []
     datetime.utcnow().replace(tzinfo=pytz.utc)
-    with open(_target, "wb") as f:
-        with httpx.stream("GET", url, follow_redirects=True) as r:
+    if client is None:
+        client = get_http_client()
+
+    with target_file as f:
+        with client.stream("GET", url, follow_redirects=True) as r:
             if r.status_code < 200 or r.status_code >= 399:
                 raise KiaraException(
                     f"Could not download file from {url}: status code {r.status_code}."
                 )
-            history.append(dict(r.headers))
+            history.append(_get_response_info(r))
             for h in r.history:
-                history.append(dict(h.headers))
-            for data in r.iter_bytes():
-                if return_md5_hash:
-                    hash_md5.update(data)
-                f.write(data)
+                history.append(_get_response_info(h))
+
+            # ranges are not hashed, so a requested md5 hash is computed on a single stream, instead of
+            # reading the (large) file a second time
+            if parallel_ranges and not return_md5_hash:
+                parallel_size = _get_parallel_download_size(r)
+            else:
+                parallel_size = 0
+            if not parallel_size:
+                for data in r.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if return_md5_hash:
+                        hash_md5.update(data)
+                    f.write(data)
+            else:
+                # use the url after redirects
+                final_url = str(r.url)
+                validator = _get_range_validator(r)
+
+    if parallel_size:
+        _download_ranges(client, final_url, _target, parallel_size, validator=validator)
 
     result_file = KiaraFile.load_file(_target.as_posix(), file_name)
 
@@ -111,6 +344,50 @@ def download_file(
         return result_file
 
 
+def download_files(
+    downloads: Iterable[Tuple[str, Union[str, None], Union[str, None]]],
+    attach_metadata: bool = True,
+    return_md5_hash: bool = False,
+    max_workers: int = 8,
+) -> List[Union[KiaraFile, Tuple[KiaraFile, str]]]:
+    """Download several files concurrently, over the connection pool of the shared http client.
+
+    Arguments:
+        downloads: (url, target, file_name) tuples, 'target' and 'file_name' are handled like in 'download_file'
+        attach_metadata: whether to attach download metadata to each result file
+        return_md5_hash: whether to return the md5 hash of each downloaded file alongside the file model
+        max_workers: the maximum number of concurrent downloads (individual files are not split into parallel ranges)
+
+    Returns:
+        the results of the individual 'download_file' calls, in the order of the provided downloads
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    downloads = list(downloads)
+    if not downloads:
+        return []
+
+    client = get_http_client()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(downloads))) as executor:
+        futures = [
+            executor.submit(
+                download_file,
+                url=url,
+                target=target,
+                file_name=file_name,
+                attach_metadata=attach_metadata,
+                return_md5_hash=return_md5_hash,
+                client=client,
+                # the files are already downloaded concurrently, also splitting them into ranges
+                # would multiply the requests waiting on the (bounded) connection pool
+                parallel_ranges=False,
+            )
+            for url, target, file_name in downloads
+        ]
+        return [f.result() for f in futures]
+
+
 def download_file_bundle(
     url: str,
     attach_metadata: bool = True,
@@ -121,7 +398,6 @@ def download_file_bundle(
     from datetime import datetime
     from urllib.parse import urlparse
 
-    import httpx
     import pytz
 
     suffix = None
@@ -134,16 +410,15 @@ def download_file_bundle(
         suffix = ""
 
     tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    atexit.register(tmp_file.close)
 
     history = []
     datetime.utcnow().replace(tzinfo=pytz.utc)
-    with open(tmp_file.name, "wb") as f:
-        with httpx.stream("GET", url, follow_redirects=True) as r:
-            history.append(dict(r.headers))
+    with tmp_file as f:
+        with get_http_client().stream("GET", url, follow_redirects=True) as r:
+            history.append(_get_response_info(r))
             for h in r.history:
-                history.append(dict(h.headers))
-            for data in r.iter_bytes():
+                history.append(_get_response_info(h))
+            for data in r.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 f.write(data)
 
     out_dir = tempfile.mkdtemp()
@@ -191,26 +466,44 @@ def download_file_bundle(
     return bundle
 
 
+def _ctx_kwargs(
+    model_cls: Type[OnboardDataModel], ctx: Union[None, AcceptContext]
+) -> Dict[str, Any]:
+    """Return the 'ctx' keyword argument for onboard models that opted into it, so models from other plugins keep working with the plain signatures."""
+
+    if ctx is None or not getattr(model_cls, "_uses_accept_context", False):
+        return {}
+    return {"ctx": ctx}
+
+
 def find_matching_onboard_models(
-    uri: str, for_bundle: bool = False
+    uri: str, for_bundle: bool = False, ctx: Union[None, AcceptContext] = None
 ) -> Mapping[Type[OnboardDataModel], Tuple[bool, str]]:
 
-    from kiara.registries.models import ModelRegistry
-
-    model_registry = ModelRegistry.instance()
-    onboard_models = model_registry.get_models_of_type(
-        OnboardDataModel
-    ).item_infos.values()
+    scheme = uri.split(":", 1)[0].lower() if ":" in uri else ""
+    candidates = _SCHEME_DISPATCH.get(scheme, None)
+    if candidates is not None:
+        registered = _resolved_onboard_models()
+        candidates = tuple(c for c in candidates if c in registered)
+        if for_bundle:
+            return {
+                c: c.accepts_bundle_uri(uri, **_ctx_kwargs(c, ctx)) for c in candidates
+            }
+        else:
+            return {c: c.accepts_uri(uri, **_ctx_kwargs(c, ctx)) for c in candidates}
 
     result = {}
-    onboard_model: Type[OnboardDataModel]
-    for onboard_model in onboard_models:  # type: ignore
+    python_cls: Type[OnboardDataModel]
+    for python_cls in _resolved_onboard_models():
 
-        python_cls: Type[OnboardDataModel] = onboard_model.python_class.get_class()  # type: ignore
         if for_bundle:
-            result[python_cls] = python_cls.accepts_bundle_uri(uri)
+            result[python_cls] = python_cls.accepts_bundle_uri(
+                uri, **_ctx_kwargs(python_cls, ctx)
+            )
         else:
-            result[python_cls] = python_cls.accepts_uri(uri)
+            result[python_cls] = python_cls.accepts_uri(
+                uri, **_ctx_kwargs(python_cls, ctx)
+            )
 
     return result
 
@@ -222,9 +515,10 @@ def onboard_file(
     attach_metadata: bool = True,
 ) -> KiaraFile:
 
+    ctx = AcceptContext()
     if not onboard_type:
 
-        model_clsses = find_matching_onboard_models(source)
+        model_clsses = find_matching_onboard_models(source, ctx=ctx)
         matches = [k for k, v in model_clsses.items() if v[0]]
         if not matches:
             raise KiaraException(
@@ -241,16 +535,20 @@ def onboard_file(
             )
 
         model_cls: Type[OnboardDataModel] = matches[0]
+        model_id: str = model_cls._kiara_model_id
 
     else:
 
         model_cls = get_onboard_model_cls(onboard_type=onboard_type)  # type: ignore
         if not model_cls:
             raise KiaraException(msg=f"Can't onboard file from '{source}' using onboard type '{onboard_type}': no onboard model found with this name.")  # type: ignore
+        model_id = model_cls._kiara_model_id
 
-        valid, msg = model_cls.accepts_uri(source)
+        valid, msg = model_cls.accepts_uri(source, **_ctx_kwargs(model_cls, ctx))
         if not valid:
-            raise KiaraException(msg=f"Can't onboard file from '{source}' using onboard type '{model_cls._kiara_model_id}': {msg}")  # type: ignore
+            raise KiaraException(
+                msg=f"Can't onboard file from '{source}' using onboard type '{model_id}': {msg}"
+            )
 
     if not model_cls.get_config_fields():
         model = model_cls()
@@ -258,10 +556,15 @@ def onboard_file(
         raise NotImplementedError()
 
     result = model.retrieve(
-        uri=source, file_name=file_name, attach_metadata=attach_metadata
+        uri=source,
+        file_name=file_name,
+        attach_metadata=attach_metadata,
+        **_ctx_kwargs(model_cls, ctx),
     )
     if not result:
-        raise KiaraException(msg=f"Can't onboard file from '{source}' using onboard type '{model_cls._kiara_model_id}': no result data retrieved. This is most likely a bug.")  # type: ignore
+        raise KiaraException(
+            msg=f"Can't onboard file from '{source}' using onboard type '{model_id}': no result data retrieved. This is most likely a bug."
+        )
 
     if isinstance(result, str):
         data = KiaraFile.load_file(result, file_name=file_name)
@@ -282,9 +585,12 @@ def onboard_file_bundle(
     attach_metadata: bool = True,
 ) -> KiaraFileBundle:
 
+    ctx = AcceptContext()
     if not onboard_type:
 
-        model_clsses = find_matching_onboard_models(uri=source, for_bundle=True)
+        model_clsses = find_matching_onboard_models(
+            uri=source, for_bundle=True, ctx=ctx
+        )
         matches = [k for k, v in model_clsses.items() if v[0]]
         if not matches:
             raise KiaraException(
@@ -301,14 +607,18 @@ def onboard_file_bundle(
             )
 
         model_cls: Type[OnboardDataModel] = matches[0]
+        model_id: str = model_cls._kiara_model_id
 
     else:
         model_cls = get_onboard_model_cls(onboard_type=onboard_type)  # type: ignore
         if not model_cls:
             raise KiaraException(msg=f"Can't onboard file from '{source}' using onboard type '{onboard_type}': no onboard model found with this name.")  # type: ignore
-        valid, msg = model_cls.accepts_bundle_uri(source)
+        model_id = model_cls._kiara_model_id
+        valid, msg = model_cls.accepts_bundle_uri(source, **_ctx_kwargs(model_cls, ctx))
         if not valid:
-            raise KiaraException(msg=f"Can't onboard file from '{source}' using onboard type '{model_cls._kiara_model_id}': {msg}")  # type: ignore
+            raise KiaraException(
+                msg=f"Can't onboard file from '{source}' using onboard type '{model_id}': {msg}"
+            )
 
     if not model_cls.get_config_fields():
         model = model_cls()
@@ -320,11 +630,16 @@ def onboard_file_bundle(
 
     try:
         result: Union[None, KiaraFileBundle] = model.retrieve_bundle(
-            uri=source, import_config=import_config, attach_metadata=attach_metadata
+            uri=source,
+            import_config=import_config,
+            attach_metadata=attach_metadata,
+            **_ctx_kwargs(model_cls, ctx),
         )
 
         if not result:
-            raise KiaraException(msg=f"Can't onboard file bundle from '{source}' using onboard type '{model_cls._kiara_model_id}': no result data retrieved. This is most likely a bug.")  # type: ignore
+            raise KiaraException(
+                msg=f"Can't onboard file bundle from '{source}' using onboard type '{model_id}': no result data retrieved. This is most likely a bug."
+            )
 
         if isinstance(result, str):
             result = KiaraFileBundle.import_folder(source=result)
@@ -334,10 +649,15 @@ def onboard_file_bundle(
 
     if not result:
         result_file = model.retrieve(
-            uri=source, file_name=None, attach_metadata=attach_metadata
+            uri=source,
+            file_name=None,
+            attach_metadata=attach_metadata,
+            **_ctx_kwargs(model_cls, ctx),
         )
         if not result_file:
-            raise KiaraException(msg=f"Can't onboard file bundle from '{source}' using onboard type '{model_cls._kiara_model_id}': no result data retrieved. This is most likely a bug.")  # type: ignore
+            raise KiaraException(
+                msg=f"Can't onboard file bundle from '{source}' using onboard type '{model_id}': no result data retrieved. This is most likely a bug."
+            )
 
         if isinstance(result, str):
             imported_bundle_file = KiaraFile.load_file(result_file)  # type: ignore
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the download helpers in `kiara_plugin.onboarding.utils.download`, run against a local http server."""
+
+import hashlib
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Tuple, Union
+
+import httpx
+import pytest
+
+from kiara.exceptions import KiaraException
+from kiara.models.filesystem import KiaraFile
+from kiara_plugin.onboarding.models import (
+    FileFromGithubModel,
+    FileFromLocalModel,
+    FileFromRemoteModel,
+    FileFromZenodoModel,
+    OnboardDataModel,
+)
+from kiara_plugin.onboarding.utils import download
+from kiara_plugin.onboarding.utils.download import (
+    _download_ranges,
+    download_file,
+    download_files,
+    find_matching_onboard_models,
+    onboard_file,
+)
+
+# odd size, so the last range is shorter than the others
+DATA = bytes(range(256)) * 4001 + b"x"
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves 'DATA' for every path, the first path segment selects how range requests are answered.
+
+    - '/ok/...': proper '206' responses, if the 'If-Range' header (if any) matches the 'ETag'
+    - '/no_206/...': ignores the 'Range' header, and answers with '200' and the full body
+    - '/short/...': '206' responses that are missing the last byte of the range
+    - '/bad_total/...': '206' responses with a wrong total size in 'Content-Range'
+    - '/changed/...': the 'ETag' changes after the first (non-range) request
+    - '/no_validator/...': like '/ok/', but without an 'ETag'
+    """
+
+    def do_GET(self):
+
+        mode = self.path.split("/")[1]
+        range_header = self.headers.get("Range", None)
+        if_range = self.headers.get("If-Range", None)
+        self.server.requested_ranges.append((self.path, range_header))  # type: ignore
+        self.server.if_range_headers.append(if_range)  # type: ignore
+
+        if mode == "no_validator":
+            etag = None
+        elif mode == "changed" and range_header:
+            etag = '"v2"'
+        else:
+            etag = '"v1"'
+
+        if range_header and mode != "no_206" and (if_range is None or if_range == etag):
+            m = re.match(r"bytes=(\d+)-(\d+)", range_header)
+            start, end = int(m[1]), int(m[2])  # type: ignore
+            body = DATA[start : end + 1]
+            if mode == "short":
+                body = body[:-1]
+            total = len(DATA) + 1 if mode == "bad_total" else len(DATA)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        else:
+            body = DATA
+            self.send_response(200)
+
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def range_server():
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    server.requested_ranges = []  # type: ignore
+    server.if_range_headers = []  # type: ignore
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def small_parallel_threshold(monkeypatch):
+    monkeypatch.setattr(download, "PARALLEL_DOWNLOAD_THRESHOLD", 1024)
+
+
+def _url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_download_ranges(range_server, tmp_path: Path):
+
+    target = tmp_path / "data.bin"
+    with httpx.Client() as client:
+        _download_ranges(
+            client,
+            _url(range_server, "/ok/data.bin"),
+            target,
+            len(DATA),
+            validator='"v1"',
+            parts=4,
+        )
+
+    assert target.read_bytes() == DATA
+    assert range_server.if_range_headers == ['"v1"'] * 4
+
+    part_size = -(-len(DATA) // 4)
+    expected = [
+        f"bytes={start}-{min(start + part_size, len(DATA)) - 1}"
+        for start in range(0, len(DATA), part_size)
+    ]
+    assert sorted(r for _, r in range_server.requested_ranges) == sorted(expected)
+
+
+def test_download_ranges_requires_partial_content(range_server, tmp_path: Path):
+
+    with httpx.Client() as client:
+        with pytest.raises(KiaraException, match="status code 200"):
+            _download_ranges(
+                client,
+                _url(range_server, "/no_206/data.bin"),
+                tmp_path / "data.bin",
+                len(DATA),
+                parts=4,
+            )
+
+
+def test_download_ranges_detects_short_reads(range_server, tmp_path: Path):
+
+    with httpx.Client() as client:
+        with pytest.raises(KiaraException, match="received"):
+            _download_ranges(
+                client,
+                _url(range_server, "/short/data.bin"),
+                tmp_path / "data.bin",
+                len(DATA),
+                parts=4,
+            )
+
+
+@pytest.mark.parametrize(
+    "mode, match",
+    [
+        ("bad_total", "Content-Range"),
+        # the server ignores the range because the 'If-Range' validator doesn't match anymore
+        ("changed", "status code 200"),
+    ],
+)
+def test_download_ranges_detects_changed_resource(
+    range_server, tmp_path: Path, mode, match
+):
+
+    with httpx.Client() as client:
+        with pytest.raises(KiaraException, match=match):
+            _download_ranges(
+                client,
+                _url(range_server, f"/{mode}/data.bin"),
+                tmp_path / "data.bin",
+                len(DATA),
+                validator='"v1"',
+                parts=4,
+            )
+
+
+def test_download_file_parallel_matches_single_stream(
+    range_server, tmp_path: Path, small_parallel_threshold
+):
+
+    url = _url(range_server, "/ok/data.bin")
+
+    # a requested md5 hash is computed on a single stream, instead of re-reading the file
+    single_file, single_md5 = download_file(
+        url, target=os.path.join(tmp_path, "single.bin"), return_md5_hash=True
+    )
+    assert all(r is None for _, r in range_server.requested_ranges)
+
+    parallel_file = download_file(url, target=os.path.join(tmp_path, "parallel.bin"))
+    assert any(r is not None for _, r in range_server.requested_ranges)
+    assert '"v1"' in range_server.if_range_headers
+
+    parallel_data = Path(parallel_file.path).read_bytes()  # type: ignore
+    assert single_md5 == hashlib.md5(parallel_data).hexdigest()  # noqa
+    assert parallel_data == DATA
+    assert single_file.size == parallel_file.size == len(DATA)  # type: ignore
+
+
+def test_download_file_without_validator_uses_single_stream(
+    range_server, tmp_path: Path, small_parallel_threshold
+):
+
+    result = download_file(
+        _url(range_server, "/no_validator/data.bin"),
+        target=os.path.join(tmp_path, "data.bin"),
+    )
+
+    assert Path(result.path).read_bytes() == DATA  # type: ignore
+    assert range_server.requested_ranges == [("/no_validator/data.bin", None)]
+
+
+def test_download_files_does_not_split_ranges(
+    range_server, tmp_path: Path, small_parallel_threshold
+):
+
+    downloads = [
+        (
+            _url(range_server, f"/ok/data_{i}.bin"),
+            os.path.join(tmp_path, f"data_{i}.bin"),
+            f"data_{i}.bin",
+        )
+        for i in range(10)
+    ]
+    results = download_files(downloads, max_workers=8)
+
+    assert len(results) == 10
+    for file_model, (_, _, file_name) in zip(results, downloads):
+        assert file_model.file_name == file_name  # type: ignore
+        assert Path(file_model.path).read_bytes() == DATA  # type: ignore
+
+    # one plain request per file, no range fan-out on top of the per-file concurrency
+    assert len(range_server.requested_ranges) == 10
+    assert all(r is None for _, r in range_server.requested_ranges)
+
+
+def test_download_file_records_response_info(range_server, tmp_path: Path):
+
+    url = _url(range_server, "/ok/data.bin")
+    result = download_file(url, target=os.path.join(tmp_path, "data.bin"))
+
+    assert result.metadata["download_info"]["response_headers"] == [
+        {
+            "status": 200,
+            "url": url,
+            "content_length": str(len(DATA)),
+            "content_type": None,
+        }
+    ]
+
+
+@pytest.fixture
+def registered_onboard_models(monkeypatch):
+    """Register the onboard models of this plugin, independent of the installed entry points."""
+
+    models = (
+        FileFromLocalModel,
+        FileFromRemoteModel,
+        FileFromZenodoModel,
+        FileFromGithubModel,
+    )
+    monkeypatch.setattr(download, "_resolved_onboard_models", lambda: models)
+    return models
+
+
+def test_find_matching_onboard_models_http(registered_onboard_models):
+
+    result = find_matching_onboard_models("https://example.com/data.csv")
+
+    # only the models for the scheme are probed, not the local file model
+    assert set(result.keys()) == {FileFromRemoteModel, FileFromZenodoModel}
+    assert result[FileFromRemoteModel][0]
+    assert not result[FileFromZenodoModel][0]
+
+
+def test_find_matching_onboard_models_unregistered_scheme(registered_onboard_models):
+
+    result = find_matching_onboard_models("zotero:abc")
+
+    assert set(result.keys()) == set(registered_onboard_models)
+    assert not any(v[0] for v in result.values())
+
+    with pytest.raises(KiaraException, match="no onboard models found"):
+        onboard_file("zotero:abc")
+
+
+def test_find_matching_onboard_models_skips_unregistered_candidates(monkeypatch):
+
+    monkeypatch.setattr(
+        download, "_resolved_onboard_models", lambda: (FileFromRemoteModel,)
+    )
+
+    result = find_matching_onboard_models("https://example.com/data.csv")
+    assert set(result.keys()) == {FileFromRemoteModel}
+
+
+class PlainSignatureModel(OnboardDataModel):
+    """An onboard model like ones from other plugins, that doesn't know about the 'ctx' argument."""
+
+    _kiara_model_id: str = "onboarding.file.from.plain_signature_test"
+
+    @classmethod
+    def accepts_uri(cls, uri: str) -> Tuple[bool, str]:
+        return uri.startswith("plain:"), "plain uri"
+
+    def retrieve(
+        self, uri: str, file_name: Union[None, str], attach_metadata: bool
+    ) -> KiaraFile:
+        path = uri[len("plain:") :]
+        return KiaraFile.load_file(path, file_name=file_name)
+
+
+def test_onboard_models_with_plain_signatures(tmp_path: Path, monkeypatch):
+
+    monkeypatch.setattr(
+        download, "_resolved_onboard_models", lambda: (PlainSignatureModel,)
+    )
+
+    source = tmp_path / "data.bin"
+    source.write_bytes(DATA)
+    uri = f"plain:{source}"
+
+    assert find_matching_onboard_models(uri) == {
+        PlainSignatureModel: (True, "plain uri")
+    }
+    result = onboard_file(uri, attach_metadata=False)
+    assert result.size == len(DATA)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the helpers used by the onboard models in `kiara_plugin.onboarding.models`."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from kiara.exceptions import KiaraException
+from kiara_plugin.onboarding.models import (
+    AcceptContext,
+    _classify,
+    _parse_zenodo_uri,
+)
+
+
+@pytest.mark.parametrize(
+    "uri, expected",
+    [
+        ("zenodo:10.5281/zenodo.123", ("10.5281/zenodo.123", None)),
+        ("zenodo:10.5281/zenodo.123/", ("10.5281/zenodo.123", None)),
+        ("zenodo:10.5281/zenodo.123/data.csv", ("10.5281/zenodo.123", "data.csv")),
+        (
+            "zenodo:10.5281/zenodo.123/dir/sub/data.csv",
+            ("10.5281/zenodo.123", "dir/sub/data.csv"),
+        ),
+        ("10.5281/zenodo.123/data.csv", ("10.5281/zenodo.123", "data.csv")),
+        (
+            "https://doi.org/10.5281/zenodo.123",
+            ("https://doi.org/10.5281/zenodo.123", None),
+        ),
+        (
+            "https://doi.org/10.5281/zenodo.123/archive.zip",
+            ("https://doi.org/10.5281/zenodo.123", "archive.zip"),
+        ),
+    ],
+)
+def test_parse_zenodo_uri(uri, expected):
+
+    assert _parse_zenodo_uri(uri) == expected
+
+
+@pytest.mark.parametrize(
+    "uri", ["zenodo:10.5281/123", "https://example.com/data.csv", "zenodo:"]
+)
+def test_parse_zenodo_uri_invalid(uri):
+
+    with pytest.raises(KiaraException):
+        _parse_zenodo_uri(uri)
+
+
+@pytest.fixture
+def local_paths(tmp_path: Path):
+
+    file_path = tmp_path / "data.csv"
+    file_path.write_text("a,b\n1,2\n")
+    dir_path = tmp_path / "folder"
+    dir_path.mkdir()
+
+    try:
+        os.symlink(file_path, tmp_path / "file_link")
+        os.symlink(dir_path, tmp_path / "dir_link")
+        os.symlink(tmp_path / "missing", tmp_path / "broken_link")
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not supported on this platform")
+
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "name, expected, expected_no_follow",
+    [
+        ("data.csv", (True, True, False), (True, True, False)),
+        ("folder", (True, False, True), (True, False, True)),
+        ("file_link", (True, True, False), (True, False, False)),
+        ("dir_link", (True, False, True), (True, False, False)),
+        ("broken_link", (False, False, False), (True, False, False)),
+        ("missing", (False, False, False), (False, False, False)),
+    ],
+)
+def test_classify(local_paths: Path, name, expected, expected_no_follow):
+
+    path = (local_paths / name).as_posix()
+
+    assert _classify(path) == expected
+    assert _classify(path, follow_symlinks=False) == expected_no_follow
+
+
+def test_classify_reuses_context(tmp_path: Path):
+
+    file_path = tmp_path / "data.csv"
+    file_path.write_text("a,b\n1,2\n")
+
+    ctx = AcceptContext()
+    assert _classify(file_path.as_posix(), ctx=ctx) == (True, True, False)
+    assert ctx.stat_checked
+
+    # the cached stat result is used, the path is not checked again
+    file_path.unlink()
+    assert _classify(file_path.as_posix(), ctx=ctx) == (True, True, False)
+    assert _classify(file_path.as_posix()) == (False, False, False)